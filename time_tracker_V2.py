@@ -1,40 +1,156 @@
 from __future__ import annotations
-import sys, csv
-from dataclasses import dataclass
+import os, sys, csv, time
+from array import array
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, date
+from functools import lru_cache, partial
+from operator import attrgetter
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
-from PySide6.QtCore import Qt, QTimer, QDate
+from PySide6.QtCore import (
+    Qt, QTimer, QDate, QAbstractTableModel, QModelIndex, QRunnable, QThreadPool, Signal
+)
 from PySide6.QtGui import QPalette, QColor, QIcon
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox, QSpacerItem,
-    QSizePolicy, QDoubleSpinBox, QDateEdit
+    QTableView, QAbstractItemView, QHeaderView, QMessageBox, QSpacerItem,
+    QSizePolicy, QDoubleSpinBox, QDateEdit, QStyledItemDelegate
 )
 
-# ---------- storage format ----------
-ISO_FMT = "%Y-%m-%dT%H:%M:%S"  # CSV format
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up totals over large histories
+    np = None
 
-@dataclass
+# ---------- storage format ----------
+# CSV columns hold ISO-8601 timestamps, YYYY-MM-DDTHH:MM:SS
+
+_EPOCH = datetime(1970, 1, 1)
+_ZERO = timedelta(0)
+_NO_OUT = -1          # out_ns of the open punch
+_VECTORIZE_MIN = 256  # punches in range before totals switch to numpy
+_NS_MIN, _NS_MAX = -(1 << 63), (1 << 63) - 1
+# first/last days whose midnight fits in int64 ns
+_FIRST_NS_DAY, _LAST_NS_DAY = date(1677, 9, 22), date(2262, 4, 11)
+
+def _to_ns(dt: datetime) -> int:
+    """Naive wall-clock nanoseconds since 1970, so differences match datetime math.
+
+    Raises ValueError outside int64 (roughly years 1678..2262).
+    """
+    ns = (dt - _EPOCH) // timedelta(microseconds=1) * 1000
+    if not _NS_MIN <= ns <= _NS_MAX:
+        raise ValueError(f"{dt} is outside the int64 nanosecond range")
+    return ns
+
+def _day_start_ns(d: date) -> int:
+    """Midnight starting d, clamped to int64 so any picker date (1752..9999) works."""
+    if d < _FIRST_NS_DAY:
+        return _NS_MIN
+    if d > _LAST_NS_DAY:
+        return _NS_MAX
+    return _to_ns(datetime.combine(d, datetime.min.time()))
+
+def _day_end_ns(d: date) -> int:
+    """Midnight ending d (exclusive bound), clamped like _day_start_ns."""
+    return _NS_MAX if d >= _LAST_NS_DAY else _day_start_ns(d + timedelta(days=1))
+
+@dataclass(slots=True)
 class Punch:
     in_time: datetime
     out_time: Optional[datetime] = None
+    # rounded duration in seconds, memoized once the punch is closed
+    _rounded: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+    # in_time.date(), computed once; in_time never changes after creation
+    in_date: date = field(init=False, repr=False, compare=False)
+    # this punch's CSV row; refreshed when it is clocked out
+    _line: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.in_date = self.in_time.date()
+        self._line = _csv_line(self)
 
     def duration(self) -> timedelta:
-        end = self.out_time or datetime.now()
-        return max(end - self.in_time, timedelta(0))
+        # only the open punch needs the current time
+        end = self.out_time if self.out_time is not None else datetime.now()
+        return max(end - self.in_time, _ZERO)
 
-def round_to_six_minutes(td: timedelta) -> timedelta:
+def _round_secs_raw(secs: int) -> int:
     """Round to nearest 6 minutes (0.1h) half-up, per punch."""
-    secs = max(0, int(td.total_seconds()))
     inc = 6 * 60
-    rounded = (secs + inc // 2) // inc
-    return timedelta(seconds=rounded * inc)
+    return (secs + inc // 2) // inc * inc
+
+# for closed punches only; the running punch's value changes every tick
+_round_secs = lru_cache(maxsize=1024)(_round_secs_raw)
+
+def punch_rounded_secs(p: Punch) -> int:
+    """Rounded duration of a punch in seconds; cached on closed punches since they never change."""
+    if p.out_time is not None and p._rounded is not None:
+        return p._rounded
+    secs = max(0, int(p.duration().total_seconds()))
+    if p.out_time is None:
+        return _round_secs_raw(secs)
+    p._rounded = _round_secs(secs)
+    return p._rounded
+
+_IN_TIME = attrgetter("in_time")
+
+_CSV_HEADER = "in_time,out_time\n"
+
+def _parse_iso(s: str) -> datetime:
+    """Parse a CSV timestamp; anything but a naive YYYY-MM-DDTHH:MM:SS is malformed."""
+    if len(s) != 19 or s[10] != "T":
+        raise ValueError(f"not YYYY-MM-DDTHH:MM:SS: {s!r}")
+    dt = datetime.fromisoformat(s)
+    if dt.tzinfo is not None:
+        raise ValueError(f"timestamp has a UTC offset: {s!r}")
+    return dt
+
+def _csv_line(p: Punch) -> str:
+    """One CSV row. ISO timestamps never need quoting, and the row is pure ASCII."""
+    tout = p.out_time.isoformat(timespec="seconds") if p.out_time else ""
+    return f"{p.in_time.isoformat(timespec='seconds')},{tout}\n"
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write data to a sibling .tmp file in a single write, then rename it over path."""
+    tmp = path.with_suffix(".tmp")
+    with tmp.open("wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+class StaleCsvError(Exception):
+    """The CSV on disk is not the size we last left it; a tail write would corrupt it."""
+
+def _write_tail(path: Path, offset: int, data: bytes, expected_size: int) -> None:
+    """Overwrite path from offset on with data, dropping anything after it.
+
+    Raises StaleCsvError (writing nothing) if the file was changed behind our back.
+    """
+    with path.open("r+b") as f:
+        if f.seek(0, 2) != expected_size:
+            raise StaleCsvError(f"{path} changed on disk")
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
 
 class TimeTrackerState:
     def __init__(self) -> None:
         self.punches: List[Punch] = []
+        # punches keyed by the date they were clocked in on
+        self._by_date: Dict[date, List[Punch]] = defaultdict(list)
+        # in/out times as int64 ns, parallel to punches
+        self.in_ns = array("q")
+        self.out_ns = array("q")
+        # in_ns/out_ns mirror punches and in_ns is ascending, so ranges can be
+        # bisected; False when that doesn't hold and totals use the date index
+        self._ns_usable = True
+        # bytes in the CSV as we last read/wrote it (None = unknown, rewrite it)
+        self._csv_size: Optional[int] = None
+        # where the open punch's row starts in the CSV, if we wrote it
+        self._open_offset: Optional[int] = None
 
     @property
     def is_clocked_in(self) -> bool:
@@ -43,12 +159,54 @@ class TimeTrackerState:
     def clock_in(self) -> None:
         if self.is_clocked_in:
             raise RuntimeError("Already clocked in.")
-        self.punches.append(Punch(in_time=datetime.now()))
+        p = Punch(in_time=datetime.now())
+        self.punches.append(p)
+        # now() can step backwards (DST, clock sync); keep each day ordered anyway
+        insort(self._by_date[p.in_date], p, key=_IN_TIME)
+        if self._ns_usable:
+            ns = _to_ns(p.in_time)
+            if self.in_ns and ns < self.in_ns[-1]:
+                self._ns_usable = False
+            self.in_ns.append(ns)
+            self.out_ns.append(_NO_OUT)
 
     def clock_out(self) -> None:
         if not self.is_clocked_in:
             raise RuntimeError("Not currently clocked in.")
-        self.punches[-1].out_time = datetime.now()
+        last = self.punches[-1]
+        last.out_time = datetime.now()
+        last._rounded = None  # refilled on next punch_rounded_secs()
+        last._line = _csv_line(last)
+        if self._ns_usable:
+            self.out_ns[-1] = _to_ns(last.out_time)
+
+    def punches_between(self, start_d: date, end_d: date) -> List[Punch]:
+        """Punches clocked in on start_d..end_d (inclusive), via the date index."""
+        out: List[Punch] = []
+        days = (end_d - start_d).days + 1
+        if days > len(self._by_date):
+            # wide range (the picker allows 1752..9999): walk the buckets instead
+            for d in sorted(d for d in self._by_date if start_d <= d <= end_d):
+                out.extend(self._by_date[d])
+            return out
+        for i in range(days):
+            out.extend(self._by_date.get(start_d + timedelta(days=i), ()))
+        return out
+
+    def closed_secs(self, start_d: date, end_d: date) -> int:
+        """Rounded seconds of the closed punches clocked in on start_d..end_d."""
+        if np is not None and self._ns_usable:
+            lo = bisect_left(self.in_ns, _day_start_ns(start_d))
+            hi = bisect_left(self.in_ns, _day_end_ns(end_d), lo)
+            if hi - lo >= _VECTORIZE_MIN:
+                ins = np.frombuffer(self.in_ns, dtype=np.int64)[lo:hi]
+                outs = np.frombuffer(self.out_ns, dtype=np.int64)[lo:hi]
+                closed = outs != _NO_OUT
+                dur_s = np.maximum(outs[closed] - ins[closed], 0) // 1_000_000_000
+                # same half-up rounding as _round_secs_raw
+                return int(((dur_s + 180) // 360).sum()) * 360
+        return sum(punch_rounded_secs(p) for p in self.punches_between(start_d, end_d)
+                   if p.out_time is not None)
 
     # ---- CSV ----
     def load_csv(self, path: Path) -> None:
@@ -59,31 +217,167 @@ class TimeTrackerState:
             reader = csv.DictReader(f)
             for row in reader:
                 try:
-                    tin = datetime.strptime(row["in_time"], ISO_FMT)
-                    tout = datetime.strptime(row["out_time"], ISO_FMT) if (row.get("out_time") or "").strip() else None
+                    tin = _parse_iso(row["in_time"])
+                    tout = _parse_iso(row["out_time"]) if (row.get("out_time") or "").strip() else None
                     out.append(Punch(tin, tout))
                 except Exception:
                     # skip malformed lines
                     continue
+        out.sort(key=_IN_TIME)  # the file may have been edited by hand
         self.punches = out
+        self._by_date = defaultdict(list)
+        for p in out:
+            self._by_date[p.in_date].append(p)
+        try:
+            self.in_ns = array("q", (_to_ns(p.in_time) for p in out))
+            self.out_ns = array("q", (_to_ns(p.out_time) if p.out_time else _NO_OUT for p in out))
+            self._ns_usable = True
+        except ValueError:
+            # a valid punch outside int64 ns (~1678..2262); keep it, skip numpy
+            self.in_ns, self.out_ns = array("q"), array("q")
+            self._ns_usable = False
+        # only append onto a file that ends in a complete line
+        with path.open("rb") as f:
+            size = f.seek(0, 2)
+            f.seek(max(size - 1, 0))
+            self._csv_size = size if f.read(1) == b"\n" else None
+        self._open_offset = None
+
+    # Saving is split in two: *_job() snapshots the bytes and updates the
+    # file bookkeeping right away, and the returned job does the disk I/O,
+    # so it can run on another thread.
+    def save_csv_job(self, path: Path) -> Callable[[], None]:
+        data = "".join([_CSV_HEADER, *(p._line for p in self.punches)]).encode("utf-8")
+        self._csv_size = len(data)
+        self._open_offset = None
+        if self.is_clocked_in:
+            self._open_offset = self._csv_size - len(self.punches[-1]._line)
+        return partial(_write_atomic, path, data)
+
+    def save_last_job(self, path: Path) -> Callable[[], None]:
+        """Job persisting the latest clock in/out by rewriting only the CSV tail.
+
+        Clocking in appends an open row; clocking out overwrites that row in
+        place. Falls back to a full save when the file layout isn't known;
+        the job raises StaleCsvError if the file changed since we last saw it.
+        """
+        last = self.punches[-1]
+        if self._csv_size is None or (last.out_time is not None and self._open_offset is None):
+            return self.save_csv_job(path)
+        offset = self._csv_size if last.out_time is None else self._open_offset
+        row = last._line.encode("utf-8")
+        expected_size = self._csv_size
+        self._csv_size = offset + len(row)
+        self._open_offset = offset if last.out_time is None else None
+        return partial(_write_tail, path, offset, row, expected_size)
+
+    def forget_file_layout(self) -> None:
+        """A write failed; make the next save rewrite the whole file."""
+        self._csv_size = None
+        self._open_offset = None
 
     def save_csv(self, path: Path) -> None:
-        tmp = path.with_suffix(".tmp")
-        with tmp.open("w", newline="", encoding="utf-8") as f:
-            w = csv.DictWriter(f, fieldnames=["in_time", "out_time"])
-            w.writeheader()
-            for p in self.punches:
-                w.writerow({
-                    "in_time": p.in_time.strftime(ISO_FMT),
-                    "out_time": p.out_time.strftime(ISO_FMT) if p.out_time else ""
-                })
-        tmp.replace(path)
+        self.save_csv_job(path)()
 
 # ---------- UI ----------
+CLOCK_FMT = "%Y-%m-%d  %H:%M:%S"  # header clock
+
+def _dark_palette() -> QPalette:
+    pal = QPalette()
+    base = QColor(30,30,30); alt = QColor(45,45,45); text = QColor(230,230,230); accent = QColor(70,120,255)
+    pal.setColor(QPalette.Window, base)
+    pal.setColor(QPalette.WindowText, text)
+    pal.setColor(QPalette.Base, QColor(25,25,25))
+    pal.setColor(QPalette.AlternateBase, alt)
+    pal.setColor(QPalette.Text, text)
+    pal.setColor(QPalette.Button, alt)
+    pal.setColor(QPalette.ButtonText, text)
+    pal.setColor(QPalette.Highlight, accent)
+    pal.setColor(QPalette.HighlightedText, QColor(255,255,255))
+    return pal
+
+# built once at import; every TimeTracker shares them
+_DARK_PALETTE = _dark_palette()
+_DARK_QSS = """
+    QWidget { color:#E6E6E6; }
+    QPushButton { border:1px solid #3A3A3A; border-radius:8px; padding:6px 12px; background:#2C2C2C; }
+    QPushButton:hover { background:#383838; }
+    QPushButton:disabled { color:#888; }
+    QHeaderView::section { background:#2C2C2C; border:0; padding:8px; font-weight:600; }
+    QTableView { gridline-color:#444; }
+"""
+
 def qdate_to_date(qd: QDate) -> date:
     return date(qd.year(), qd.month(), qd.day())
 
+class PunchesModel(QAbstractTableModel):
+    """Read-only table over a list of punches; cells are formatted on demand."""
+    HEADERS = ("Date", "In", "Out", "Rounded h (0.1h)")
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._punches: List[Punch] = []
+
+    def set_punches(self, punches: List[Punch]) -> None:
+        self.beginResetModel()
+        self._punches = punches
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self._punches)
+
+    def columnCount(self, parent=QModelIndex()) -> int:  # noqa: N802
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):  # noqa: N802
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        p = self._punches[index.row()]
+        col = index.column()
+        # the cached CSV line is "YYYY-MM-DDTHH:MM:SS,[YYYY-MM-DDTHH:MM:SS]",
+        # formatted once per punch, so cells are just slices of it
+        if col == 0:
+            return p._line[:10]
+        if col == 1:
+            return p._line[11:19]
+        if col == 2:
+            return p._line[31:39] if p.out_time else "— (running)"
+        r_hours = punch_rounded_secs(p) / 3600.0
+        return f"{r_hours:.1f}"
+
+class CenterDelegate(QStyledItemDelegate):
+    """Centers every cell, so the model doesn't answer alignment per cell."""
+    def initStyleOption(self, option, index) -> None:  # noqa: N802
+        super().initStyleOption(option, index)
+        option.displayAlignment = Qt.AlignCenter
+
+class _SaveTask(QRunnable):
+    """Runs one prepared save job on a pool thread."""
+    def __init__(self, job: Callable[[], None], on_error: Callable[[str], None],
+                 on_stale: Callable[[], None]) -> None:
+        super().__init__()
+        self._job = job
+        self._on_error = on_error
+        self._on_stale = on_stale
+
+    def run(self) -> None:
+        try:
+            self._job()
+        except StaleCsvError:
+            self._on_stale()
+        except OSError as e:
+            self._on_error(str(e))
+
 class TimeTracker(QWidget):
+    # emitted from the save thread
+    save_failed = Signal(str)
+    save_stale = Signal()
+
     def __init__(self) -> None:
         super().__init__()
         self.setWindowTitle("Sar's Time Tracker - BeepBoop")
@@ -93,6 +387,13 @@ class TimeTracker(QWidget):
         self.data_path = Path(__file__).with_name("time_tracker_data.csv")
         self.state = TimeTrackerState()
         self.state.load_csv(self.data_path)
+        # a single thread keeps saves in order: tail writes build on earlier ones
+        self._io_pool = QThreadPool(self)
+        self._io_pool.setMaxThreadCount(1)
+        # (start, end, rounded seconds of closed punches) for the 1 Hz footer
+        self._cached_range: Optional[Tuple[date, date, int]] = None
+        # what the table was last filled from; see _populate_table
+        self._last_table_sig: Optional[tuple] = None
 
         self._build_ui()
         self._apply_dark()
@@ -162,11 +463,13 @@ class TimeTracker(QWidget):
         root.addLayout(act)
 
         # Table (simple)
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Date", "In", "Out", "Rounded h (0.1h)"])
+        self.model = PunchesModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setItemDelegate(CenterDelegate(self.table))
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
         root.addWidget(self.table)
 
@@ -182,49 +485,46 @@ class TimeTracker(QWidget):
         root.addLayout(foot)
 
     def _apply_dark(self) -> None:
-        pal = QPalette()
-        base = QColor(30,30,30); alt = QColor(45,45,45); text = QColor(230,230,230); accent = QColor(70,120,255)
-        pal.setColor(QPalette.Window, base)
-        pal.setColor(QPalette.WindowText, text)
-        pal.setColor(QPalette.Base, QColor(25,25,25))
-        pal.setColor(QPalette.AlternateBase, alt)
-        pal.setColor(QPalette.Text, text)
-        pal.setColor(QPalette.Button, alt)
-        pal.setColor(QPalette.ButtonText, text)
-        pal.setColor(QPalette.Highlight, accent)
-        pal.setColor(QPalette.HighlightedText, QColor(255,255,255))
-        self.setPalette(pal)
-        self.setStyleSheet("""
-            QWidget { color:#E6E6E6; }
-            QPushButton { border:1px solid #3A3A3A; border-radius:8px; padding:6px 12px; background:#2C2C2C; }
-            QPushButton:hover { background:#383838; }
-            QPushButton:disabled { color:#888; }
-            QHeaderView::section { background:#2C2C2C; border:0; padding:8px; font-weight:600; }
-            QTableWidget { gridline-color:#444; }
-        """)
-        QApplication.setStyle("Fusion")
+        self.setPalette(_DARK_PALETTE)
+        self.setStyleSheet(_DARK_QSS)
 
     def _wire(self) -> None:
         self.btn_in.clicked.connect(self.on_in)
         self.btn_out.clicked.connect(self.on_out)
+        self.save_failed.connect(self._on_save_failed)
+        self.save_stale.connect(self._on_save_stale)
         self.start_date.dateChanged.connect(self._refresh)
         self.end_date.dateChanged.connect(self._refresh)
-        self.rate_input.valueChanged.connect(self._refresh_footer_only)
+        # recompute the footer once the wage stops changing, not per keystroke
+        self._rate_timer = QTimer(self)
+        self._rate_timer.setSingleShot(True)
+        self._rate_timer.setInterval(120)
+        self._rate_timer.timeout.connect(self._refresh_footer_only)
+        self.rate_input.valueChanged.connect(self._rate_timer.start)
 
     def _start_timers(self) -> None:
+        # one 1 Hz timer drives both the clock and the footer
         self.clock_timer = QTimer(self)
-        self.clock_timer.timeout.connect(self._tick)
-        self.clock_timer.start(250)
-
-        self.ui_timer = QTimer(self)
-        self.ui_timer.timeout.connect(self._refresh_footer_only)
-        self.ui_timer.start(1000)
+        self.clock_timer.setTimerType(Qt.PreciseTimer)  # stay on the second boundary
+        self.clock_timer.timeout.connect(self._on_second)
+        self._tick()
+        msec_to_next_sec = 1000 - datetime.now().microsecond // 1000
+        QTimer.singleShot(msec_to_next_sec, self._start_clock_timer)
+
+    def _start_clock_timer(self) -> None:
+        self.clock_timer.start(1000)
+        self._on_second()
+
+    def _on_second(self) -> None:
+        self._tick()
+        self._refresh_footer_only()
 
     # ---- slots ----
     def on_in(self) -> None:
         try:
             self.state.clock_in()
-            self.state.save_csv(self.data_path)
+            self._cached_range = None
+            self._save_in_background(self.state.save_last_job(self.data_path))
         except RuntimeError as e:
             QMessageBox.warning(self, "Already Clocked In", str(e))
         self._refresh()
@@ -232,22 +532,38 @@ class TimeTracker(QWidget):
     def on_out(self) -> None:
         try:
             self.state.clock_out()
-            self.state.save_csv(self.data_path)
+            self._cached_range = None
+            self._save_in_background(self.state.save_last_job(self.data_path))
         except RuntimeError as e:
             QMessageBox.warning(self, "Not Clocked In", str(e))
         self._refresh()
 
+    def _save_in_background(self, job: Callable[[], None]) -> None:
+        self._io_pool.start(_SaveTask(job, self.save_failed.emit, self.save_stale.emit))
+
+    def _on_save_stale(self) -> None:
+        # the CSV was edited, synced or truncated elsewhere: rewrite it whole
+        self.state.forget_file_layout()
+        self._save_in_background(self.state.save_csv_job(self.data_path))
+
+    def _on_save_failed(self, msg: str) -> None:
+        self.state.forget_file_layout()
+        QMessageBox.warning(self, "Save Failed",
+                            f"Could not save punches: {msg}\n"
+                            "They will be saved again on the next punch or on close.")
+
     def _tick(self) -> None:
-        self.clock_label.setText(datetime.now().strftime("%Y-%m-%d  %H:%M:%S"))
+        self.clock_label.setText(time.strftime(CLOCK_FMT))
 
     # ---- helpers ----
     def _punches_in_range(self, start_d: date, end_d: date) -> List[Punch]:
         if start_d > end_d:
             start_d, end_d = end_d, start_d
-        return [p for p in self.state.punches if start_d <= p.in_time.date() <= end_d]
+        return self.state.punches_between(start_d, end_d)
 
     # ---- refresh ----
     def _refresh(self) -> None:
+        self._cached_range = None  # punches or range changed
         self.btn_in.setEnabled(not self.state.is_clocked_in)
         self.btn_out.setEnabled(self.state.is_clocked_in)
         self.status_label.setText("Status: ✅ Clocked In" if self.state.is_clocked_in else "Status: ⏹ Not clocked in")
@@ -257,33 +573,32 @@ class TimeTracker(QWidget):
     def _populate_table(self) -> None:
         start_d = qdate_to_date(self.start_date.date())
         end_d = qdate_to_date(self.end_date.date())
-        punches = self._punches_in_range(start_d, end_d)
-        punches.sort(key=lambda p: (p.in_time, p.out_time or datetime.max))
-
-        self.table.setRowCount(0)
-        for p in punches:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(p.in_time.strftime("%Y-%m-%d")))
-            self.table.setItem(row, 1, QTableWidgetItem(p.in_time.strftime("%H:%M:%S")))
-            self.table.setItem(row, 2, QTableWidgetItem(p.out_time.strftime("%H:%M:%S") if p.out_time else "— (running)"))
-            r_hours = round_to_six_minutes(p.duration()).total_seconds() / 3600.0
-            self.table.setItem(row, 3, QTableWidgetItem(f"{r_hours:.1f}"))
-            for c in range(4):
-                it = self.table.item(row, c)
-                if it:
-                    it.setTextAlignment(Qt.AlignCenter)
+        punches = self.state.punches
+        sig = (start_d, end_d, len(punches), self.state.is_clocked_in,
+               punches[-1].out_time if punches else None)
+        if sig == self._last_table_sig:
+            return
+        self.model.set_punches(self._punches_in_range(start_d, end_d))
+        self._last_table_sig = sig
 
     def _refresh_footer_only(self) -> None:
         start_d = qdate_to_date(self.start_date.date())
         end_d = qdate_to_date(self.end_date.date())
-        punches = self._punches_in_range(start_d, end_d)
+        if start_d > end_d:
+            start_d, end_d = end_d, start_d
+
+        cached = self._cached_range
+        if cached is None or cached[0] != start_d or cached[1] != end_d:
+            closed = self.state.closed_secs(start_d, end_d)
+            cached = self._cached_range = (start_d, end_d, closed)
 
-        total_rounded = timedelta(0)
-        for p in punches:
-            total_rounded += round_to_six_minutes(p.duration())
+        total_secs = cached[2]
+        if self.state.is_clocked_in:
+            running = self.state.punches[-1]
+            if start_d <= running.in_date <= end_d:
+                total_secs += punch_rounded_secs(running)
 
-        hours = total_rounded.total_seconds() / 3600.0
+        hours = total_secs / 3600.0
         self.total_label.setText(f"Total hours (rounded): {hours:.1f}")
 
         wage = float(self.rate_input.value())
@@ -293,12 +608,14 @@ class TimeTracker(QWidget):
     # save on close
     def closeEvent(self, e) -> None:  # noqa: N802
         try:
-            self.state.save_csv(self.data_path)
+            self._io_pool.waitForDone()
+            self.state.save_csv(self.data_path)  # synchronous, so nothing is lost
         finally:
             super().closeEvent(e)
 
 def main():
     app = QApplication(sys.argv)
+    app.setStyle("Fusion")
     w = TimeTracker()
     w.show()
     sys.exit(app.exec())